@@ -1,20 +1,52 @@
 import streamlit as st
 import sqlite3
+import threading
+import random
+import string
+import numpy as np
 import pandas as pd
+from contextlib import contextmanager
 from datetime import datetime, date, timedelta
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 
 DB_PATH = "rca.db"
 
 # ---------------------- DB helpers ----------------------
+@st.cache_resource
 def get_conn():
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
-
+    # One long-lived connection per server process keeps SQLite's page cache warm across reruns
+    c = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+    c.execute("PRAGMA journal_mode=WAL")
+    c.execute("PRAGMA synchronous=NORMAL")
+    c.execute("PRAGMA temp_store=MEMORY")
+    c.execute("PRAGMA cache_size=-65536")
+    c.execute("PRAGMA mmap_size=268435456")
+    return c
+
+@st.cache_resource
+def db_lock():
+    # Sessions share the connection, so statements/transactions must not interleave
+    return threading.Lock()
+
+@contextmanager
+def write_txn():
+    conn = get_conn()
+    with db_lock():
+        conn.execute("BEGIN")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except Exception:
+            # Never leave the shared connection inside a transaction (e.g. COMMIT hitting SQLITE_BUSY)
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+@st.cache_resource
 def init_db():
+    # Schema + ANALYZE once per server process rather than on every rerun
     conn = get_conn()
-    cur = conn.cursor()
-    cur.executescript("""
+    with db_lock():
+        conn.executescript("""
     PRAGMA foreign_keys = ON;
 
     CREATE TABLE IF NOT EXISTS rcas (
@@ -67,33 +99,48 @@ def init_db():
         linked_rca_id TEXT,
         FOREIGN KEY (linked_rca_id) REFERENCES rcas(rca_id) ON DELETE SET NULL
     );
+
+    CREATE INDEX IF NOT EXISTS idx_actions_rca ON actions(rca_id);
+    CREATE INDEX IF NOT EXISTS idx_evidence_action ON evidence(action_id);
+    CREATE INDEX IF NOT EXISTS idx_incidents_created ON incidents(created_at);
+    CREATE INDEX IF NOT EXISTS idx_rcas_env_created ON rcas(environment, created_at);
+
+    ANALYZE;
     """)
-    conn.commit()
-    conn.close()
 
 def qdf(sql, params=None):
-    conn = get_conn()
-    df = pd.read_sql_query(sql, conn, params=params or {})
-    conn.close()
-    return df
+    with db_lock():
+        return pd.read_sql_query(sql, get_conn(), params=params or {})
 
 def exec_sql(sql, params=None):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute(sql, params or {})
-    conn.commit()
-    conn.close()
+    with write_txn() as conn:
+        conn.execute(sql, params or {})
 
 def exec_many(sql, rows):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.executemany(sql, rows)
-    conn.commit()
-    conn.close()
+    with write_txn() as conn:
+        conn.executemany(sql, rows)
+
+# Low-cardinality action columns as categoricals to shrink the cached frame
+# (status values mirror the CHECK constraint in init_db)
+ACTION_DTYPES = {
+    "status": pd.CategoricalDtype(["To Do","In Progress","Evidence Submitted","Verified","Closed"]),
+    "action_type": "category",
+}
+
+# Read-mostly tables: cached across reruns, cleared by invalidate_caches() on writes.
+# The TTL only bounds staleness from writers outside this app.
+@st.cache_data(ttl=60, show_spinner=False)
+def load_actions():
+    return qdf("SELECT * FROM actions").astype(ACTION_DTYPES)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_evidence():
+    return qdf("SELECT * FROM evidence")
+
+ID_ALPHABET = string.ascii_uppercase + string.digits
 
 def gen_id(prefix):
-    import random, string
-    return f"{prefix}-" + "".join(random.choice(string.ascii_uppercase + string.digits) for _ in range(7))
+    return f"{prefix}-" + "".join(random.choices(ID_ALPHABET, k=7))
 
 # ---------------------- AI-ish helpers ----------------------
 def build_rca_corpus(rca_df):
@@ -101,26 +148,57 @@ def build_rca_corpus(rca_df):
     if rca_df.empty:
         return [], []
     actions = qdf("SELECT rca_id, action_text FROM actions")
-    grouped = actions.groupby("rca_id")["action_text"].apply(lambda s: " | ".join(s.tolist())).to_dict()
-    texts = []
-    ids = []
-    for _, r in rca_df.iterrows():
-        ids.append(r["rca_id"])
-        texts.append(" ".join([str(r.get("title","") or ""), str(r.get("root_cause","") or ""), grouped.get(r["rca_id"], "")]))
+    grouped = actions.groupby("rca_id")["action_text"].agg(" | ".join)
+    rca_df = rca_df.fillna({"title": "", "root_cause": ""})
+    acts = rca_df["rca_id"].map(grouped).fillna("")
+    texts = (rca_df["title"] + " " + rca_df["root_cause"] + " " + acts).tolist()
+    ids = rca_df["rca_id"].tolist()
     return ids, texts
 
-def top_similar_rcas(query_text, topk=5):
+def corpus_signature():
+    # Cheap fingerprint of the corpus so the fitted vectorizer is only rebuilt when content changes
+    r = qdf("SELECT COUNT(*) AS n, COALESCE(MAX(created_at),'') AS ts FROM rcas").iloc[0]
+    a = qdf("SELECT COUNT(*) AS n, COALESCE(MAX(rowid),0) AS ts FROM actions").iloc[0]
+    return (int(r["n"]), str(r["ts"]), int(a["n"]), int(a["ts"]))
+
+@st.cache_resource(show_spinner=False)
+def hashing_vectorizer():
+    # sklearn (and scipy) imported on first similarity search, not at app start.
+    # Stateless: no vocabulary to fit, memory bounded by n_features
+    from sklearn.feature_extraction.text import HashingVectorizer
+    return HashingVectorizer(stop_words="english", ngram_range=(1,2), n_features=2**18, alternate_sign=False, norm="l2")
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_corpus(signature):
     rcas = qdf("SELECT rca_id, title, root_cause, oem, environment, created_at, status FROM rcas")
     ids, texts = build_rca_corpus(rcas)
     if not ids:
+        return rcas, None, None
+    from sklearn.feature_extraction.text import TfidfTransformer
+    # Only the IDF weights are fitted; hashing the texts needs no vocabulary
+    tfidf = TfidfTransformer()
+    X = tfidf.fit_transform(hashing_vectorizer().transform(texts))
+    return rcas, X, tfidf
+
+def invalidate_caches():
+    # Call after any write to rcas/actions/evidence
+    load_actions.clear()
+    load_evidence.clear()
+    _load_corpus.clear()
+
+def top_similar_rcas(query_text, topk=5):
+    rcas, X, tfidf = _load_corpus(corpus_signature())
+    if X is None:
         return pd.DataFrame()
-    vect = TfidfVectorizer(stop_words="english", ngram_range=(1,2), max_features=6000)
-    X = vect.fit_transform(texts + [query_text])
-    sims = cosine_similarity(X[-1], X[:-1]).flatten()
-    rcas = rcas.copy()
-    rcas["similarity"] = sims
-    rcas = rcas.sort_values("similarity", ascending=False).head(topk)
-    return rcas[["rca_id","title","oem","environment","created_at","status","similarity"]]
+    qv = tfidf.transform(hashing_vectorizer().transform([query_text]))
+    # Rows are L2-normalised by TfidfTransformer, so cosine is just the sparse dot product
+    sims = np.asarray(X.dot(qv.T).todense()).ravel()
+    # O(N) partial selection, then only the top k get sorted
+    idx = np.argpartition(-sims, min(topk, len(sims)-1))[:topk]
+    idx = idx[np.argsort(-sims[idx])]
+    out = rcas.iloc[idx].copy()
+    out["similarity"] = sims[idx]
+    return out[["rca_id","title","oem","environment","created_at","status","similarity"]]
 
 # ---------------------- UI ----------------------
 st.set_page_config(page_title="RCA Closed-Loop Dashboard (MVP)", layout="wide")
@@ -141,54 +219,62 @@ with st.sidebar:
     if st.button("Seed demo data"):
         from seed import seed_demo
         seed_demo(DB_PATH)
+        invalidate_caches()
         st.success("Seeded demo data. Refreshing...")
         st.rerun()
 
 # Data queries
 params = {"oem_like": f"%{oem_filter.strip()}%"}
-rca_sql = """
+
+def rca_filter():
+    # WHERE clause + named params mirroring the sidebar filters
+    where = ["oem LIKE :oem_like"]
+    p = dict(params)
+    if env_filter:
+        where.append("environment IN (%s)" % ",".join(f":env{i}" for i in range(len(env_filter))))
+        p.update({f"env{i}": v for i, v in enumerate(env_filter)})
+    if status_filter:
+        where.append("status IN (%s)" % ",".join(f":status{i}" for i in range(len(status_filter))))
+        p.update({f"status{i}": v for i, v in enumerate(status_filter)})
+    if show_last_6_months_prelive:
+        where.append("environment = 'Pre-Live' AND created_at >= :cutoff")
+        p["cutoff"] = (date.today() - timedelta(days=183)).isoformat()
+    return " AND ".join(where), p
+
+rca_where, rca_params = rca_filter()
+rca_sql = f"""
 SELECT * FROM rcas
-WHERE oem LIKE :oem_like
+WHERE {rca_where}
 """
-rcas = qdf(rca_sql, params)
+rcas = qdf(rca_sql, rca_params)
 
-if env_filter:
-    rcas = rcas[rcas["environment"].isin(env_filter)]
-if status_filter:
-    rcas = rcas[rcas["status"].isin(status_filter)]
-
-if show_last_6_months_prelive:
-    cutoff = (date.today() - timedelta(days=183)).isoformat()
-    rcas = rcas[(rcas["environment"]=="Pre-Live") & (rcas["created_at"] >= cutoff)]
-
-actions = qdf("SELECT * FROM actions")
-evidence = qdf("SELECT * FROM evidence")
-incidents = qdf("SELECT * FROM incidents")
+actions = load_actions()
+evidence = load_evidence()
+# actions with at least one piece of evidence (shared by the tabs below)
+ev_actions = set(evidence["action_id"].values)
 
 # KPI calculations
 def kpi_counts():
-    if rcas.empty:
+    where, p = rca_where, dict(rca_params)
+    p["today"] = date.today().isoformat()
+    k = qdf(f"""
+    WITH f AS (SELECT rca_id FROM rcas WHERE {where})
+    SELECT COUNT(*) AS n,
+           TOTAL(a.status IN ('To Do','In Progress','Evidence Submitted')) AS open_actions,
+           TOTAL(a.due_date < :today AND a.status IN ('To Do','In Progress','Evidence Submitted')) AS overdue,
+           TOTAL(e.action_id IS NULL AND a.status IN ('To Do','In Progress','Evidence Submitted')) AS missing_evidence,
+           AVG(a.status IN ('Verified','Closed')) * 100.0 AS verified_pct,
+           AVG(e.action_id IS NOT NULL) * 100.0 AS evidenced_pct
+    FROM actions a JOIN f USING(rca_id)
+    LEFT JOIN (SELECT DISTINCT action_id FROM evidence) e USING(action_id)
+    """, p).iloc[0]
+    if not k["n"]:
         return dict(open_actions=0, overdue=0, missing_evidence=0, verified_pct=0.0, evidenced_pct=0.0, recurrence_30=0)
-    # actions tied to current filtered rcas
-    a = actions[actions["rca_id"].isin(rcas["rca_id"])].copy()
-    if a.empty:
-        return dict(open_actions=0, overdue=0, missing_evidence=0, verified_pct=0.0, evidenced_pct=0.0, recurrence_30=0)
-    open_actions = (a["status"].isin(["To Do","In Progress","Evidence Submitted"])).sum()
-    # overdue
-    today = date.today().isoformat()
-    a_due = a.dropna(subset=["due_date"]).copy()
-    overdue = ((a_due["due_date"] < today) & (a_due["status"].isin(["To Do","In Progress","Evidence Submitted"]))).sum()
-    # missing evidence for actions that are not verified/closed
-    ev_actions = set(evidence["action_id"].unique().tolist())
-    missing_evidence = ((~a["action_id"].isin(ev_actions)) & (a["status"].isin(["To Do","In Progress","Evidence Submitted"]))).sum()
-    verified_pct = float((a["status"].isin(["Verified","Closed"])).mean() * 100.0)
-    evidenced_pct = float((a["action_id"].isin(ev_actions)).mean() * 100.0)
     # recurrence proxy: incidents last 30 days similar to prior RCAs and not linked OR linked to non-verified actions
     cutoff = (date.today() - timedelta(days=30)).isoformat()
-    recent_inc = incidents[incidents["created_at"] >= cutoff].copy()
-    recurrence_30 = len(recent_inc)
-    return dict(open_actions=int(open_actions), overdue=int(overdue), missing_evidence=int(missing_evidence),
-                verified_pct=verified_pct, evidenced_pct=evidenced_pct, recurrence_30=int(recurrence_30))
+    recurrence_30 = qdf("SELECT COUNT(*) AS n FROM incidents WHERE created_at >= :cutoff", {"cutoff": cutoff}).iloc[0]["n"]
+    return dict(open_actions=int(k["open_actions"]), overdue=int(k["overdue"]), missing_evidence=int(k["missing_evidence"]),
+                verified_pct=float(k["verified_pct"]), evidenced_pct=float(k["evidenced_pct"]), recurrence_30=int(recurrence_30))
 
 k = kpi_counts()
 c1, c2, c3, c4, c5 = st.columns(5)
@@ -198,6 +284,99 @@ c3.metric("Missing evidence", k["missing_evidence"])
 c4.metric("Evidenced %", f'{k["evidenced_pct"]:.0f}%')
 c5.metric("Verified/Closed %", f'{k["verified_pct"]:.0f}%')
 
+# Fragments rerun on their own when their widgets change; st.rerun() inside still refreshes the whole page
+@st.experimental_fragment
+def incident_match_panel():
+    st.subheader("New Incident (AI match)")
+    st.write("Paste a new incident summary. The MVP uses **TF‑IDF similarity** to suggest likely related RCAs (open-source).")
+    inc_oem = st.text_input("OEM", value="Nissan")
+    inc_env = st.selectbox("Environment", ["Production","UAT","Pre-Live"])
+    inc_system = st.text_input("System / component", value="")
+    inc_sev = st.selectbox("Severity", ["P1","P2","P3","P4"], index=1)
+    inc_summary = st.text_area("Incident summary", height=120, placeholder="Describe the issue. Example: 'Same UAT timeout observed again in production during ...'")
+
+    colA, colB = st.columns([1,1])
+    with colA:
+        if st.button("Find similar RCAs"):
+            if not inc_summary.strip():
+                st.warning("Please enter an incident summary.")
+            else:
+                sims = top_similar_rcas(f"{inc_oem} {inc_env} {inc_system} {inc_summary}")
+                if sims.empty:
+                    st.info("No RCAs found yet.")
+                else:
+                    st.dataframe(sims, use_container_width=True, hide_index=True)
+                    st.caption("Use this to detect recurrence like the Nissan example and force re-verification when needed.")
+
+    with colB:
+        if st.button("Log incident"):
+            if not inc_summary.strip():
+                st.warning("Please enter an incident summary.")
+            else:
+                inc_id = gen_id("INC")
+                now = date.today().isoformat()
+                exec_sql("""
+                    INSERT INTO incidents (incident_id,oem,environment,system_component,severity,summary,created_at,linked_rca_id)
+                    VALUES (:incident_id,:oem,:environment,:system_component,:severity,:summary,:created_at,:linked_rca_id)
+                """, dict(incident_id=inc_id,oem=inc_oem,environment=inc_env,system_component=inc_system,severity=inc_sev,
+                          summary=inc_summary,created_at=now,linked_rca_id=None))
+                st.success(f"Incident logged: {inc_id}")
+
+@st.experimental_fragment
+def add_evidence_panel():
+    with st.expander("Add evidence to an action", expanded=False):
+        a_list = qdf("SELECT action_id, rca_id, action_text FROM actions ORDER BY due_date ASC")
+        if a_list.empty:
+            st.info("No actions yet.")
+        else:
+            text_by_id = dict(zip(a_list["action_id"], a_list["action_text"]))
+            aid = st.selectbox("Action", a_list["action_id"].tolist(), format_func=lambda x: f"{x} — {text_by_id.get(x,'')[:60]}")
+            etype = st.selectbox("Evidence type", ["Link","File note","Screenshot note","Test run note","Monitoring note"])
+            eref = st.text_input("Evidence reference (URL or note)", value="")
+            submitted_by = st.text_input("Submitted by", value="")
+            if st.button("Add evidence"):
+                if not eref.strip():
+                    st.warning("Evidence reference is required.")
+                else:
+                    evid = gen_id("EVD")
+                    exec_sql("""
+                        INSERT INTO evidence (evidence_id,action_id,evidence_type,evidence_ref,submitted_by,submitted_at)
+                        VALUES (:evidence_id,:action_id,:evidence_type,:evidence_ref,:submitted_by,:submitted_at)
+                    """, dict(evidence_id=evid,action_id=aid,evidence_type=etype,evidence_ref=eref,
+                              submitted_by=submitted_by,submitted_at=date.today().isoformat()))
+                    invalidate_caches()
+                    st.success(f"Added evidence {evid}")
+                    st.rerun()
+
+@st.experimental_fragment
+def verify_action_panel():
+    with st.expander("Verify / close an action", expanded=False):
+        a_list = qdf("SELECT action_id, action_text, status FROM actions ORDER BY due_date ASC")
+        if a_list.empty:
+            st.info("No actions yet.")
+        else:
+            label_by_id = {x: f"{status_} — {text_[:55]}" for x, status_, text_ in zip(a_list["action_id"], a_list["status"], a_list["action_text"])}
+            aid = st.selectbox("Action to update", a_list["action_id"].tolist(),
+                               format_func=lambda x: f"{x} — {label_by_id.get(x,'')}")
+            new_status = st.selectbox("New status", ["In Progress","Evidence Submitted","Verified","Closed"], index=2)
+            verified_by = st.text_input("Verified by", value="")
+            notes = st.text_area("Verification notes", height=80)
+            if st.button("Update action status"):
+                params = dict(status=new_status, verified_by=verified_by.strip() or None,
+                              verified_at=date.today().isoformat() if new_status in ("Verified","Closed") else None,
+                              notes=notes.strip() or None, action_id=aid)
+                exec_sql("""
+                    UPDATE actions
+                    SET status=:status,
+                        verified_by=COALESCE(:verified_by, verified_by),
+                        verified_at=COALESCE(:verified_at, verified_at),
+                        verification_notes=COALESCE(:notes, verification_notes)
+                    WHERE action_id=:action_id
+                """, params)
+                invalidate_caches()
+                st.success("Updated.")
+                st.rerun()
+
 tab1, tab2, tab3, tab4, tab5 = st.tabs(["RCA Audit", "Action Tracker", "RCA Detail", "New Incident (AI match)", "Admin"])
 
 with tab1:
@@ -206,17 +385,18 @@ with tab1:
     if rcas.empty:
         st.info("No RCAs match your filters.")
     else:
-        # Add derived counts
-        a = actions.groupby("rca_id").size().rename("actions_total")
-        a_open = actions[actions["status"].isin(["To Do","In Progress","Evidence Submitted"])].groupby("rca_id").size().rename("actions_open")
-        ev = evidence.groupby("action_id").size().rename("evidence_count")
-        action_ev = actions[["action_id","rca_id"]].merge(ev, how="left", on="action_id").fillna({"evidence_count":0})
-        ev_missing = action_ev[action_ev["evidence_count"]==0].groupby("rca_id").size().rename("actions_missing_evidence")
-        view = rcas.merge(a, left_on="rca_id", right_index=True, how="left") \
-                   .merge(a_open, left_on="rca_id", right_index=True, how="left") \
-                   .merge(ev_missing, left_on="rca_id", right_index=True, how="left") \
-                   .fillna({"actions_total":0,"actions_open":0,"actions_missing_evidence":0})
-        view = view.sort_values(["environment","created_at"], ascending=[True, False])
+        # Add derived counts (rca filter lives in a subquery: status/created_at also exist on actions)
+        view = qdf(f"""
+        SELECT r.*,
+               COUNT(a.action_id) AS actions_total,
+               COALESCE(SUM(a.status IN ('To Do','In Progress','Evidence Submitted')), 0) AS actions_open,
+               COALESCE(SUM(a.action_id IS NOT NULL AND e.action_id IS NULL), 0) AS actions_missing_evidence
+        FROM (SELECT * FROM rcas WHERE {rca_where}) r
+        LEFT JOIN actions a ON a.rca_id = r.rca_id
+        LEFT JOIN (SELECT DISTINCT action_id FROM evidence) e ON e.action_id = a.action_id
+        GROUP BY r.rca_id
+        ORDER BY r.environment, r.created_at DESC
+        """, rca_params)
         st.dataframe(view[["rca_id","oem","environment","system_component","severity","title","created_at","status","actions_total","actions_open","actions_missing_evidence"]],
                      use_container_width=True, hide_index=True)
 
@@ -225,13 +405,12 @@ with tab2:
     if rcas.empty:
         st.info("No RCAs match your filters.")
     else:
-        a = actions[actions["rca_id"].isin(rcas["rca_id"])].copy()
+        a = actions[actions["rca_id"].isin(rcas["rca_id"])]
         if a.empty:
             st.info("No actions for current RCA selection.")
         else:
             # Add evidence present flag
-            ev_actions = set(evidence["action_id"].unique().tolist())
-            a["evidence_present"] = a["action_id"].isin(ev_actions)
+            a = a.assign(evidence_present=a["action_id"].isin(ev_actions))
             st.dataframe(a[["action_id","rca_id","action_text","owner_team","owner_person","due_date","status","evidence_present","verification_method","verified_by","verified_at"]],
                          use_container_width=True, hide_index=True)
             st.caption("Tip: keep the rule — **not done until Evidence Submitted + Verified**.")
@@ -241,8 +420,9 @@ with tab3:
     if rcas.empty:
         st.info("No RCAs match your filters.")
     else:
-        selected = st.selectbox("Select RCA", rcas["rca_id"].tolist(), format_func=lambda rid: f"{rid} — {rcas.set_index('rca_id').loc[rid,'title']}")
-        r = rcas.set_index("rca_id").loc[selected].to_dict()
+        rca_by_id = {row.rca_id: row._asdict() for row in rcas.itertuples(index=False)}
+        selected = st.selectbox("Select RCA", list(rca_by_id), format_func=lambda rid: f"{rid} — {rca_by_id[rid]['title']}")
+        r = rca_by_id[selected]
         left, right = st.columns([2,1])
         with left:
             st.markdown(f"### {r['title']}")
@@ -258,18 +438,16 @@ with tab3:
 
         st.divider()
         st.markdown("#### Remedial actions")
-        a = actions[actions["rca_id"]==selected].copy()
+        a = actions[actions["rca_id"]==selected]
         if a.empty:
             st.info("No actions recorded for this RCA yet.")
         else:
-            ev_actions = set(evidence["action_id"].unique().tolist())
-            a["evidence_present"] = a["action_id"].isin(ev_actions)
+            a = a.assign(evidence_present=a["action_id"].isin(ev_actions))
             st.dataframe(a[["action_id","action_text","action_type","owner_team","owner_person","due_date","status","evidence_present","verification_method","verified_by","verified_at"]],
                          use_container_width=True, hide_index=True)
 
         st.markdown("#### Evidence")
-        ev = evidence.merge(actions[["action_id","rca_id","action_text"]], on="action_id", how="left")
-        ev = ev[ev["rca_id"]==selected].copy()
+        ev = evidence[evidence["action_id"].isin(a["action_id"])]
         if ev.empty:
             st.info("No evidence uploaded/linked yet.")
         else:
@@ -277,40 +455,7 @@ with tab3:
                          use_container_width=True, hide_index=True)
 
 with tab4:
-    st.subheader("New Incident (AI match)")
-    st.write("Paste a new incident summary. The MVP uses **TF‑IDF similarity** to suggest likely related RCAs (open-source).")
-    inc_oem = st.text_input("OEM", value="Nissan")
-    inc_env = st.selectbox("Environment", ["Production","UAT","Pre-Live"])
-    inc_system = st.text_input("System / component", value="")
-    inc_sev = st.selectbox("Severity", ["P1","P2","P3","P4"], index=1)
-    inc_summary = st.text_area("Incident summary", height=120, placeholder="Describe the issue. Example: 'Same UAT timeout observed again in production during ...'")
-
-    colA, colB = st.columns([1,1])
-    with colA:
-        if st.button("Find similar RCAs"):
-            if not inc_summary.strip():
-                st.warning("Please enter an incident summary.")
-            else:
-                sims = top_similar_rcas(f"{inc_oem} {inc_env} {inc_system} {inc_summary}")
-                if sims.empty:
-                    st.info("No RCAs found yet.")
-                else:
-                    st.dataframe(sims, use_container_width=True, hide_index=True)
-                    st.caption("Use this to detect recurrence like the Nissan example and force re-verification when needed.")
-
-    with colB:
-        if st.button("Log incident"):
-            if not inc_summary.strip():
-                st.warning("Please enter an incident summary.")
-            else:
-                inc_id = gen_id("INC")
-                now = date.today().isoformat()
-                exec_sql("""
-                    INSERT INTO incidents (incident_id,oem,environment,system_component,severity,summary,created_at,linked_rca_id)
-                    VALUES (:incident_id,:oem,:environment,:system_component,:severity,:summary,:created_at,:linked_rca_id)
-                """, dict(incident_id=inc_id,oem=inc_oem,environment=inc_env,system_component=inc_system,severity=inc_sev,
-                          summary=inc_summary,created_at=now,linked_rca_id=None))
-                st.success(f"Incident logged: {inc_id}")
+    incident_match_panel()
 
 with tab5:
     st.subheader("Admin")
@@ -340,6 +485,7 @@ with tab5:
                     VALUES (:rca_id,:oem,:environment,:system_component,:severity,:title,:root_cause,:created_by,:created_at,:status)
                 """, dict(rca_id=rid,oem=oem,environment=env,system_component=system_component,severity=sev,title=title,
                           root_cause=root_cause,created_by=created_by,created_at=created_at,status=status))
+                invalidate_caches()
                 st.success(f"Created {rid}. Go to RCA Detail to add actions.")
                 st.rerun()
 
@@ -348,7 +494,8 @@ with tab5:
         if rca_list.empty:
             st.info("No RCAs yet.")
         else:
-            rid = st.selectbox("RCA", rca_list["rca_id"].tolist(), format_func=lambda x: f"{x} — {rca_list.set_index('rca_id').loc[x,'title']}")
+            title_by_id = dict(zip(rca_list["rca_id"], rca_list["title"]))
+            rid = st.selectbox("RCA", rca_list["rca_id"].tolist(), format_func=lambda x: f"{x} — {title_by_id.get(x,'')}")
             col1, col2, col3 = st.columns(3)
             with col1:
                 owner_team = st.text_input("Owner team", value="Tech")
@@ -374,52 +521,9 @@ with tab5:
                     """, dict(action_id=aid,rca_id=rid,action_text=action_text,action_type=action_type,
                               owner_team=owner_team,owner_person=owner_person,due_date=due_date,status=status,
                               verification_method=verification_method))
+                    invalidate_caches()
                     st.success(f"Added action {aid}")
                     st.rerun()
 
-    with st.expander("Add evidence to an action", expanded=False):
-        a_list = qdf("SELECT action_id, rca_id, action_text FROM actions ORDER BY due_date ASC")
-        if a_list.empty:
-            st.info("No actions yet.")
-        else:
-            aid = st.selectbox("Action", a_list["action_id"].tolist(), format_func=lambda x: f"{x} — {a_list.set_index('action_id').loc[x,'action_text'][:60]}")
-            etype = st.selectbox("Evidence type", ["Link","File note","Screenshot note","Test run note","Monitoring note"])
-            eref = st.text_input("Evidence reference (URL or note)", value="")
-            submitted_by = st.text_input("Submitted by", value="")
-            if st.button("Add evidence"):
-                if not eref.strip():
-                    st.warning("Evidence reference is required.")
-                else:
-                    evid = gen_id("EVD")
-                    exec_sql("""
-                        INSERT INTO evidence (evidence_id,action_id,evidence_type,evidence_ref,submitted_by,submitted_at)
-                        VALUES (:evidence_id,:action_id,:evidence_type,:evidence_ref,:submitted_by,:submitted_at)
-                    """, dict(evidence_id=evid,action_id=aid,evidence_type=etype,evidence_ref=eref,
-                              submitted_by=submitted_by,submitted_at=date.today().isoformat()))
-                    st.success(f"Added evidence {evid}")
-                    st.rerun()
-
-    with st.expander("Verify / close an action", expanded=False):
-        a_list = qdf("SELECT action_id, action_text, status FROM actions ORDER BY due_date ASC")
-        if a_list.empty:
-            st.info("No actions yet.")
-        else:
-            aid = st.selectbox("Action to update", a_list["action_id"].tolist(),
-                               format_func=lambda x: f"{x} — {a_list.set_index('action_id').loc[x,'status']} — {a_list.set_index('action_id').loc[x,'action_text'][:55]}")
-            new_status = st.selectbox("New status", ["In Progress","Evidence Submitted","Verified","Closed"], index=2)
-            verified_by = st.text_input("Verified by", value="")
-            notes = st.text_area("Verification notes", height=80)
-            if st.button("Update action status"):
-                params = dict(status=new_status, verified_by=verified_by.strip() or None,
-                              verified_at=date.today().isoformat() if new_status in ("Verified","Closed") else None,
-                              notes=notes.strip() or None, action_id=aid)
-                exec_sql("""
-                    UPDATE actions
-                    SET status=:status,
-                        verified_by=COALESCE(:verified_by, verified_by),
-                        verified_at=COALESCE(:verified_at, verified_at),
-                        verification_notes=COALESCE(:notes, verification_notes)
-                    WHERE action_id=:action_id
-                """, params)
-                st.success("Updated.")
-                st.rerun()
+    add_evidence_panel()
+    verify_action_panel()